@@ -20,6 +20,8 @@ import google.generativeai as genai
 from PIL import Image
 import numpy as np
 
+import story_store
+
 # ── 페이지 설정 ──────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="포동 PHODONG",
@@ -290,13 +292,9 @@ def age_language_guide(age: int) -> str:
 
 
 # ── Gemini 캐릭터 생성 ────────────────────────────────────────────────────────
-def generate_character(image: Image.Image, config: StoryConfig, seen_types: list) -> Optional[dict]:
-    api_key = get_api_key()
-    if not api_key:
-        st.error("API 키가 설정되지 않았습니다.")
-        return None
-
-    genai.configure(api_key=api_key)
+def request_character(image: Image.Image, config: StoryConfig, seen_types: list) -> Optional[dict]:
+    """API·파싱 오류는 예외로 올려보내고, 사물이 없거나 중복일 때만 None 을 돌려줍니다."""
+    genai.configure(api_key=get_api_key())
     model = genai.GenerativeModel(GEMINI_MODEL)
 
     seen_str = ", ".join(seen_types) if seen_types else "없음"
@@ -332,12 +330,19 @@ def generate_character(image: Image.Image, config: StoryConfig, seen_types: list
 }}
 사물이 없거나 중복이면 "has_interesting_object": false 로 설정하세요.
 """
+    response = model.generate_content([prompt, image])
+    text = response.text.strip()
+    text = re.sub(r"```json|```", "", text).strip()
+    data = json.loads(text)
+    return data if data.get("has_interesting_object") else None
+
+
+def generate_character(image: Image.Image, config: StoryConfig, seen_types: list) -> Optional[dict]:
+    if not get_api_key():
+        st.error("API 키가 설정되지 않았습니다.")
+        return None
     try:
-        response = model.generate_content([prompt, image])
-        text = response.text.strip()
-        text = re.sub(r"```json|```", "", text).strip()
-        data = json.loads(text)
-        return data if data.get("has_interesting_object") else None
+        return request_character(image, config, seen_types)
     except Exception as e:
         logger.error(f"캐릭터 생성 오류: {e}")
         return None
@@ -493,6 +498,41 @@ def render_config():
             st.session_state["seen_types"] = []
             st.rerun()
 
+    render_prebuilt_stories()
+
+
+# ── 미리 만든 동화 (batch.py) ─────────────────────────────────────────────────
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_story_list() -> list:
+    return story_store.list_stories()
+
+def render_prebuilt_stories():
+    stories = cached_story_list()
+    if not stories:
+        return
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    with st.expander(f"📚 미리 만든 동화 ({len(stories)}편)"):
+        labels = [
+            f"{s['title']} — {s['config'].get('child_name', '')} ({s['created_at']})"
+            for s in stories
+        ]
+        idx = st.selectbox("동화 선택", options=range(len(stories)),
+                           format_func=lambda i: labels[i],
+                           key="prebuilt_story", label_visibility="collapsed")
+        if st.button("📖 바로 읽기", use_container_width=True):
+            data = story_store.load_story(stories[idx]["key"])
+            if not data:
+                st.warning("동화를 불러오지 못했어요.")
+                return
+            cards = [StoryCard(**c) for c in data["cards"]]
+            st.session_state["config"]     = StoryConfig(**data["config"])
+            st.session_state["cards"]      = cards
+            st.session_state["seen_types"] = [c.character_type for c in cards]
+            st.session_state["story_text"] = data["story_text"]
+            st.session_state["step"]       = "story"
+            st.rerun()
+
 
 # ── STEP 2: 카메라 화면 ───────────────────────────────────────────────────────
 def render_camera():
@@ -606,9 +646,7 @@ def render_story():
             st.session_state["story_text"] = story
 
     # 제목/본문 분리
-    lines = story.strip().split("\n")
-    title = lines[0].strip() if lines else "나만의 동화"
-    body  = "\n".join(lines[1:]).strip() if len(lines) > 1 else story
+    title, body = story_store.split_story(story)
 
     # 헤더
     st.markdown(f"""
@@ -664,7 +702,7 @@ def render_story():
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("🔄 새 동화 만들기", type="primary", use_container_width=True):
         for key in ["step", "config", "cards", "seen_types", "story_text",
-                    "processing", "sel_genre", "sel_purpose"]:
+                    "processing", "sel_genre", "sel_purpose", "prebuilt_story"]:
             st.session_state.pop(key, None)
         st.rerun()
 
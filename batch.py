@@ -0,0 +1,264 @@
+"""
+==============================================================================
+🧸 포동 PHODONG — 오프라인 일괄 생성 CLI (키오스크·교실 행사용)
+==============================================================================
+브라우저 없이 사진 폴더와 StoryConfig 목록으로 캐릭터 카드·동화를 미리 만들어
+로컬 저장소(story_store)에 넣어둡니다. 웹 앱은 설정 화면에서 바로 불러옵니다.
+
+  - app.py 의 request_character / generate_story 를 그대로 사용
+  - 작업(설정 1개 = 동화 1편)을 제한된 수의 워커로 동시에 처리
+  - 실패해도 다시 실행하면 이어서 진행 (완성된 동화는 건너뛰고,
+    이미 만든 캐릭터 카드는 저장소에서 재사용)
+
+configs.json 예시:
+  [
+    {"child_name": "민준", "partner_name": "뽀로로", "age": 7, "genre": "모험", "purpose": "도전"},
+    {"child_name": "서연", "age": 6, "genre": "우정", "purpose": "배려",
+     "photos": ["cup.jpg", "clock.jpg", "hat.jpg", "book.jpg"]}
+  ]
+  "photos" 를 생략하면 사진 폴더의 모든 사진을 이름순으로 사용합니다.
+
+사용법:
+  python batch.py --photos photos/ --configs configs.json --workers 4
+==============================================================================
+"""
+
+import os, io, sys, json, time, argparse, logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+from PIL import Image
+
+import story_store
+from app import (
+    MAX_SCENES, StoryConfig, StoryCard,
+    get_api_key, request_character, generate_story, image_to_b64,
+)
+
+logger = logging.getLogger("Phodong.batch")
+
+PHOTO_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+# ── 작업 정의 ─────────────────────────────────────────────────────────────────
+@dataclass
+class BatchJob:
+    config: StoryConfig
+    photos: List[str]  # 사진 파일 경로
+    key:    str = ""   # story_store.story_key — 설정·사진이 같으면 같은 동화
+
+@dataclass
+class JobResult:
+    job:     BatchJob
+    status:  str = "failed"   # done / skipped / failed
+    key:     str = ""
+    cards:   int = 0
+    calls:   int = 0          # 실제 Gemini 호출 수
+    error:   str = ""
+    elapsed: float = 0.0
+
+class JobError(Exception):
+    pass
+
+class NoCardsError(JobError):
+    """쓸 수 있는 카드가 없음 — 사물 없음 응답도 캐시되므로 다시 해도 결과가 같아 재시도하지 않습니다."""
+
+
+def job_key(config: StoryConfig, paths: List[str]) -> str:
+    hashes = []
+    for path in paths:
+        with open(path, "rb") as f:
+            hashes.append(story_store.photo_hash(f.read()))
+    return story_store.story_key(asdict(config), hashes)
+
+
+def load_jobs(photo_dir: str, configs_path: str) -> List[BatchJob]:
+    all_photos = sorted(
+        name for name in os.listdir(photo_dir)
+        if name.lower().endswith(PHOTO_EXTS)
+    )
+    with open(configs_path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    if not isinstance(entries, list):
+        raise ValueError("configs 파일은 설정 목록(JSON 배열)이어야 해요")
+
+    jobs = []
+    for i, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError("설정은 JSON 객체여야 해요")
+            names = entry.pop("photos", None)
+            if names is None:
+                names = all_photos
+            elif not isinstance(names, list) or not names or not all(isinstance(n, str) for n in names):
+                raise ValueError("\"photos\" 는 사진 파일 이름이 하나 이상 든 목록이어야 해요")
+            if not names:
+                raise ValueError(f"사진 폴더에 사진이 없어요: {photo_dir}")
+            missing = [n for n in names if not os.path.isfile(os.path.join(photo_dir, n))]
+            if missing:
+                raise ValueError(f"사진을 찾을 수 없어요: {', '.join(missing)}")
+            config = StoryConfig(**entry)
+            paths  = [os.path.join(photo_dir, n) for n in names]
+            jobs.append(BatchJob(config=config, photos=paths, key=job_key(config, paths)))
+        except (ValueError, TypeError) as e:
+            raise type(e)(f"configs[{i}] {entry!r}: {e}") from e
+    return jobs
+
+
+# ── 작업 실행 ─────────────────────────────────────────────────────────────────
+def is_story_error(text: str) -> bool:
+    # generate_story 는 예외 대신 오류 문구를 돌려줍니다
+    return not text or text == "API 키 오류" or text.startswith("동화 생성 오류")
+
+
+def build_cards(job: BatchJob, result: JobResult, store_dir: Optional[str]) -> List[StoryCard]:
+    config = asdict(job.config)
+    cards: List[StoryCard] = []
+    seen_types: list = []
+
+    for path in job.photos:
+        if len(cards) >= MAX_SCENES:
+            break
+        with open(path, "rb") as f:
+            raw = f.read()
+        image = Image.open(io.BytesIO(raw)).convert("RGB")
+        image.thumbnail((800, 800))
+
+        key  = story_store.card_key(story_store.photo_hash(raw), config, seen_types)
+        data = story_store.load_card(key, store_dir)
+        if data is None:
+            result.calls += 1
+            try:
+                data = request_character(image, job.config, seen_types)
+            except Exception as e:
+                # 일시적인 API 오류(할당량·타임아웃 등) — 장면이 빠진 동화를 저장하지 않도록 작업째 재시도
+                raise JobError(f"캐릭터 생성 오류 ({os.path.basename(path)}): {e}") from e
+            # 사물 없음·중복도 모델의 정상 응답이므로 저장해 재시도 때 다시 묻지 않습니다
+            data = data or {"has_interesting_object": False}
+            story_store.save_card(key, data, store_dir)
+
+        if not data.get("has_interesting_object"):
+            logger.info(f"[{job.config.child_name}] 사물 없음·중복: {os.path.basename(path)}")
+            continue
+
+        cards.append(StoryCard(
+            character_name=data.get("character_name", ""),
+            character_type=data.get("character_type", ""),
+            personality=data.get("personality", ""),
+            magic_power=data.get("magic_power", ""),
+            dialogue=data.get("dialogue", ""),
+            story_narration=data.get("story_narration", ""),
+            image_b64=image_to_b64(image),
+        ))
+        seen_types.append(data.get("character_type", ""))
+
+    if not cards:
+        raise NoCardsError("인식된 사물이 하나도 없어요")
+    return cards
+
+
+def run_job(job: BatchJob, store_dir: Optional[str], retries: int, force: bool) -> JobResult:
+    result = JobResult(job=job, key=job.key)
+    config = asdict(job.config)
+
+    started = time.perf_counter()
+    if not force and story_store.load_story(result.key, store_dir):
+        result.status = "skipped"
+        return result
+
+    for attempt in range(retries + 1):
+        try:
+            cards = build_cards(job, result, store_dir)
+            result.calls += 1
+            story = generate_story(cards, job.config)
+            if is_story_error(story):
+                raise JobError(story or "빈 동화")
+            story_store.save_story(result.key, config, [asdict(c) for c in cards], story, store_dir)
+            result.status = "done"
+            result.cards  = len(cards)
+            result.error  = ""
+            break
+        except NoCardsError as e:
+            result.error = f"{type(e).__name__}: {e}"
+            logger.warning(f"[{job.config.child_name}] 실패 — {result.error}")
+            break
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            logger.warning(f"[{job.config.child_name}] 시도 {attempt + 1}/{retries + 1} 실패 — {result.error}")
+            if attempt < retries:
+                time.sleep(2 ** attempt)
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+# ── 메인 ─────────────────────────────────────────────────────────────────────
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="포동 캐릭터·동화 일괄 생성")
+    parser.add_argument("--photos", required=True, help="사진 폴더")
+    parser.add_argument("--configs", required=True, help="StoryConfig 목록 JSON 파일")
+    parser.add_argument("--workers", type=int, default=4, help="동시 작업 수 (기본: 4)")
+    parser.add_argument("--retries", type=int, default=2, help="작업당 재시도 횟수 (기본: 2)")
+    parser.add_argument("--store", default=None,
+                        help=f"저장소 폴더 (기본: PHODONG_STORE 또는 {story_store.STORE_DIR})")
+    parser.add_argument("--force", action="store_true", help="이미 만든 동화도 다시 생성")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers 는 1 이상이어야 해요")
+    if args.retries < 0:
+        parser.error("--retries 는 0 이상이어야 해요")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if not get_api_key():
+        logger.error("API 키가 설정되지 않았습니다. GOOGLE_API_KEY 환경변수를 확인하세요.")
+        return 2
+
+    try:
+        jobs = load_jobs(args.photos, args.configs)
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"작업 목록을 읽지 못했어요 — {e}")
+        return 2
+
+    # 설정·사진이 같은 작업은 같은 동화이므로 한 번만 만듭니다
+    unique: dict = {}
+    for i, job in enumerate(jobs):
+        if job.key in unique:
+            logger.info(f"configs[{i}] ({job.config.child_name}) 는 앞선 설정과 같아 건너뜁니다")
+        else:
+            unique[job.key] = job
+    duplicates = len(jobs) - len(unique)
+    logger.info(f"작업 {len(unique)}개 시작 (중복 {duplicates}개 제외, 워커 {args.workers}개)")
+
+    started = time.perf_counter()
+    results: List[JobResult] = []
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="batch") as pool:
+        futures = [pool.submit(run_job, job, args.store, args.retries, args.force) for job in unique.values()]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            logger.info(f"[{len(results)}/{len(unique)}] {r.job.config.child_name} → {r.status} "
+                        f"(카드 {r.cards}개, 호출 {r.calls}회, {r.elapsed:.1f}s) {r.error}")
+    wall = time.perf_counter() - started
+
+    done    = sum(r.status == "done" for r in results)
+    skipped = sum(r.status == "skipped" for r in results)
+    failed  = sum(r.status == "failed" for r in results)
+    calls   = sum(r.calls for r in results)
+    print(f"\n완료 {done} · 건너뜀 {skipped} · 중복 {duplicates} · 실패 {failed} / 전체 {len(jobs)}")
+    print(f"소요 {wall:.1f}s · 처리량 {done / wall if wall else 0:.2f} 동화/s · "
+          f"Gemini 호출 {calls}회 ({calls / wall if wall else 0:.2f} 회/s)")
+    for r in results:
+        if r.status == "failed":
+            print(f"  ✗ {r.job.config.child_name}: {r.error}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+"""
+==============================================================================
+🧸 포동 PHODONG — 동시 세션 부하 테스트 (streamlit.testing AppTest)
+==============================================================================
+app.py 한 프로세스가 몇 명의 아이를 동시에 받을 수 있는지 측정합니다.
+  - N개의 가상 세션이 동시에 [설정] → [카메라] → [동화] 흐름을 끝까지 진행
+  - Gemini 대신 지연시간을 흉내 내는 로컬 대역 모델 사용 (API 키·네트워크 불필요)
+  - N을 늘려가며 rerun 지연 백분위수, 처리량, 최대 RSS, 최대 스레드 수 보고
+
+AppTest 는 실행할 때마다 전역 Runtime·st.secrets 를 만들고 지우기 때문에 한 프로세스에서
+여러 개를 동시에 돌리면 서로의 런타임을 망가뜨립니다. 그래서 세션마다 별도 프로세스를 띄우고
+RSS·스레드 수는 프로세스별 값을 합산합니다. 실제 서버는 세션들이 한 프로세스를 공유하므로
+기본 메모리(import·런타임)를 한 번만 쓰는 추정치(est)도 함께 보고합니다.
+
+사용법:
+  python loadtest.py --sessions 1,2,4,8,16
+  python loadtest.py --sessions 4,8 --char-latency 2.0 --story-latency 6.0 --json result.json
+==============================================================================
+"""
+
+import os, io, re, sys, json, math, time, queue, random, argparse, itertools, threading, logging, traceback
+import multiprocessing
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+import streamlit as st
+import google.generativeai as genai
+from streamlit.testing.v1 import AppTest
+from PIL import Image
+
+from app import MAX_SCENES
+
+logger = logging.getLogger("Phodong.loadtest")
+
+# ── 상수 ─────────────────────────────────────────────────────────────────────
+APP_PATH  = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PHOTO_KEY = "_loadtest_photo"
+
+# 여기서 시작된 예외는 앱이 아니라 AppTest·런타임 쪽 문제로 봅니다
+_ST_DIR       = os.path.dirname(os.path.abspath(st.__file__))
+_HARNESS_DIRS = tuple(os.path.join(_ST_DIR, d) + os.sep for d in ("runtime", "testing"))
+
+CHILD_NAMES = ["민준", "서연", "도윤", "하은", "지호", "수아"]
+OBJECT_TYPES = ["컵", "연필", "인형", "시계", "우산", "장난감 자동차", "모자", "책"]
+
+
+# ── 로컬 대역 모델 ────────────────────────────────────────────────────────────
+@dataclass
+class StandInLatency:
+    char_mean:  float = 1.5   # 캐릭터 생성(Vision) 평균 지연(초)
+    story_mean: float = 5.0   # 동화 생성 평균 지연(초)
+    jitter:     float = 0.3   # 표준편차 비율 (평균 대비)
+
+    def sample(self, mean: float) -> float:
+        return max(0.0, random.gauss(mean, mean * self.jitter))
+
+
+class _StandInResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StandInModel:
+    """genai.GenerativeModel 대역. 실제 호출처럼 스레드를 잠재우고 JSON/텍스트를 돌려줍니다."""
+
+    latency = StandInLatency()
+    _counter = itertools.count()
+
+    def __init__(self, model_name: str = "", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents):
+        # [prompt, image] → 캐릭터 생성, prompt 문자열 → 동화 생성
+        if isinstance(contents, (list, tuple)):
+            time.sleep(self.latency.sample(self.latency.char_mean))
+            n = next(self._counter)
+            obj = OBJECT_TYPES[n % len(OBJECT_TYPES)]
+            return _StandInResponse("```json\n" + json.dumps({
+                "has_interesting_object": True,
+                "character_name": f"{obj} 요정 {n}",
+                "character_type": f"{obj} {n}",
+                "magic_power": "반짝반짝 빛나는 용기를 나눠주는 힘",
+                "personality": "다정하고 씩씩해요",
+                "dialogue": "괜찮아, 너는 할 수 있어!",
+                "story_narration": f"{obj}가 살금살금 다가와 말을 걸었어요.",
+            }, ensure_ascii=False) + "\n```")
+
+        time.sleep(self.latency.sample(self.latency.story_mean))
+        body = "\n".join("친구들은 반짝반짝 빛나는 숲길을 함께 걸었어요." for _ in range(20))
+        return _StandInResponse(f"용기 있는 모험\n{body}\n끝.")
+
+
+def _stand_in_camera_input(*args, **kwargs):
+    """st.camera_input 대역. AppTest는 카메라 위젯을 다룰 수 없으므로
+    하네스가 세션 상태에 넣어둔 사진을 한 번만 돌려줍니다."""
+    data = st.session_state.pop(PHOTO_KEY, None)
+    return io.BytesIO(data) if data else None
+
+
+def install_stand_ins(latency: StandInLatency):
+    StandInModel.latency = latency
+    genai.configure = lambda *args, **kwargs: None
+    genai.GenerativeModel = StandInModel
+    st.camera_input = _stand_in_camera_input
+    # AppTest는 실행 중 st.secrets 를 전역으로 바꿔치기하므로 환경변수로 키를 넘깁니다
+    os.environ.setdefault("GOOGLE_API_KEY", "loadtest-stand-in")
+
+
+def make_photos(count: int, size=(640, 480)) -> List[bytes]:
+    photos = []
+    for _ in range(count):
+        color = tuple(random.randint(0, 255) for _ in range(3))
+        buf = io.BytesIO()
+        Image.new("RGB", size, color).save(buf, format="JPEG", quality=85)
+        photos.append(buf.getvalue())
+    return photos
+
+
+# ── 리소스 측정 ───────────────────────────────────────────────────────────────
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ResourceSampler(threading.Thread):
+    """부하 구간 동안 RSS와 스레드 수를 주기적으로 샘플링해 최댓값을 기록합니다."""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.interval     = interval
+        self.peak_rss     = 0
+        self.peak_threads = 0
+        self._stop_event  = threading.Event()
+
+    def sample(self):
+        self.peak_rss     = max(self.peak_rss, current_rss_bytes())
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+
+    def run(self):
+        self.sample()
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+# ── 하네스 오류 감지 ──────────────────────────────────────────────────────────
+class SessionError(Exception):
+    def __init__(self, message: str, harness: bool = False):
+        super().__init__(message)
+        self.harness = harness
+
+
+def raised_in_harness(stack_trace: List[str]) -> bool:
+    """가장 안쪽 프레임이 streamlit.runtime / streamlit.testing 이면 하네스 오류입니다."""
+    files = re.findall(r'File "([^"]+)"', "\n".join(stack_trace or []))
+    return bool(files) and os.path.abspath(files[-1]).startswith(_HARNESS_DIRS)
+
+
+def is_harness_exception(e: Exception) -> bool:
+    if isinstance(e, SessionError):
+        return e.harness
+    # rerun 시간 초과는 앱이 느린 것이므로 부하 결과로 셉니다
+    if str(e).startswith("AppTest script run timed out"):
+        return False
+    return raised_in_harness(traceback.format_tb(e.__traceback__))
+
+
+class TracebackCollector(logging.Handler):
+    """AppTest 스크립트 스레드나 streamlit 내부에서 새어 나온 오류를 모읍니다."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.records: List[str] = []
+
+    def emit(self, record):
+        self.records.append(f"{record.name}: {record.getMessage()}")
+
+    def install(self):
+        logging.getLogger("streamlit").addHandler(self)
+        previous = threading.excepthook
+
+        def hook(args):
+            self.records.append(f"{args.thread.name if args.thread else '?'}: "
+                                f"{args.exc_type.__name__}: {args.exc_value}")
+            previous(args)
+
+        threading.excepthook = hook
+
+
+# ── 가상 세션 ─────────────────────────────────────────────────────────────────
+@dataclass
+class SessionResult:
+    index:         int
+    ok:            bool = False
+    error:         str = ""
+    harness_error: bool = False   # 앱이 아닌 하네스·런타임 문제로 실패
+    elapsed:       float = 0.0
+    latencies:     List[float] = field(default_factory=list)
+    base_rss:      int = 0        # 워밍업 후 측정 직전 RSS
+    peak_rss:      int = 0
+    peak_threads:  int = 0
+
+
+def run_session(index: int, photos: List[bytes], timeout: float) -> SessionResult:
+    result = SessionResult(index=index)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def rerun(stage: str, prepare=None):
+        if prepare:
+            prepare()
+        t0 = time.perf_counter()
+        at.run()
+        result.latencies.append(time.perf_counter() - t0)
+        if at.exception:
+            exc = at.exception[0]
+            raise SessionError(f"{stage}: {exc.value}", harness=raised_in_harness(exc.stack_trace))
+
+    def button(label: str):
+        for b in at.button:
+            if b.label == label:
+                return b
+        raise SessionError(f"'{label}' 버튼을 찾을 수 없어요 (step={at.session_state['step']})")
+
+    def take_photo(i: int):
+        at.session_state[PHOTO_KEY] = photos[i % len(photos)]
+
+    started = time.perf_counter()
+    try:
+        # STEP 1: 설정
+        rerun("load")
+        at.text_input[0].input(CHILD_NAMES[index % len(CHILD_NAMES)])
+        at.text_input[1].input("친구")
+        at.selectbox[0].select(random.choice([5, 6, 7, 8]))
+        rerun("genre", lambda: at.button(key=f"genre_{random.choice(['판타지', '모험', '우정'])}").click())
+        rerun("purpose", lambda: at.button(key=f"purpose_{random.choice(['자신감', '협동', '도전'])}").click())
+        rerun("start", lambda: button("✨ 모험 시작하기!").click())
+        if at.session_state["step"] != "camera":
+            raise SessionError(f"start: 카메라 단계로 넘어가지 못했어요 (step={at.session_state['step']})")
+
+        # STEP 2: 카메라 — 마지막 장면에서 동화 생성까지 한 번의 rerun 안에서 진행
+        for i in range(MAX_SCENES):
+            rerun(f"camera#{i + 1}", lambda i=i: take_photo(i))
+
+        # STEP 3: 동화
+        if at.session_state["step"] != "story" or not at.session_state["story_text"]:
+            raise SessionError(f"story: 동화가 만들어지지 않았어요 (step={at.session_state['step']})")
+        rerun("story")
+        result.ok = True
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.harness_error = is_harness_exception(e)
+        logger.warning(f"세션 {index} 실패 — {result.error}")
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _session_worker(index: int, photos: List[bytes], timeout: float, latency: StandInLatency,
+                    seed: Optional[int], warmup: int, barrier, results):
+    """세션 1개 전용 프로세스. 워밍업을 마치고 모든 워커가 모이면 동시에 측정을 시작합니다."""
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(None if seed is None else seed + index)
+    collector = TracebackCollector()
+    collector.install()
+
+    result = None
+    try:
+        install_stand_ins(latency)
+        for _ in range(warmup):
+            run_session(index, photos, timeout)
+    except Exception as e:
+        result = SessionResult(index=index, error=f"워커 준비 실패 — {type(e).__name__}: {e}",
+                               harness_error=True)
+
+    base_rss = current_rss_bytes()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        result = result or SessionResult(index=index, error="다른 워커가 준비되지 않아 시작하지 못했어요",
+                                         harness_error=True)
+
+    if result is None:
+        sampler = ResourceSampler()
+        sampler.start()
+        result = run_session(index, photos, timeout)
+        sampler.stop()
+        result.base_rss     = base_rss
+        result.peak_rss     = sampler.peak_rss
+        result.peak_threads = sampler.peak_threads
+
+    if collector.records and not result.harness_error:
+        result.ok            = False
+        result.harness_error = True
+        result.error         = f"스크립트 스레드 오류 — {collector.records[0]}"
+    results.put(asdict(result))
+
+
+# ── 부하 단계 ─────────────────────────────────────────────────────────────────
+@dataclass
+class LevelReport:
+    sessions:        int
+    ok:              int
+    failed:          int
+    harness_errors:  int
+    wall_s:          float
+    reruns:          int
+    p50_ms:          float
+    p90_ms:          float
+    p99_ms:          float
+    max_ms:          float
+    sessions_per_s:  float
+    reruns_per_s:    float
+    peak_rss_mb:     float    # 워커 프로세스 최대 RSS 합계
+    est_rss_mb:      float    # 한 프로세스 공유 시 추정치 (기본 RSS 1회 + 세션별 증가분)
+    peak_threads:    int      # 워커 프로세스 최대 스레드 수 합계
+    errors:          List[str] = field(default_factory=list)
+
+
+def run_level(n: int, photos: List[bytes], timeout: float, latency: StandInLatency,
+              seed: Optional[int], warmup: int) -> LevelReport:
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(n + 1)
+    results = ctx.Queue()
+    session_timeout = timeout * (MAX_SCENES + 6)
+    workers = [
+        ctx.Process(target=_session_worker, daemon=True,
+                    args=(i, photos, timeout, latency, seed, warmup, barrier, results))
+        for i in range(n)
+    ]
+    for w in workers:
+        w.start()
+
+    try:
+        barrier.wait(timeout=session_timeout * max(1, warmup) + 60)
+    except threading.BrokenBarrierError:
+        logger.warning("워커 준비 시간이 초과되었어요")
+    t0 = time.perf_counter()
+    finished = []
+    for _ in range(n):
+        try:
+            finished.append(SessionResult(**results.get(timeout=session_timeout)))
+        except queue.Empty:
+            break
+    wall = time.perf_counter() - t0
+
+    for w in workers:
+        w.join(timeout=5)
+        if w.is_alive():
+            w.terminate()
+    done = {r.index for r in finished}
+    finished += [
+        SessionResult(index=i, error="워커 프로세스가 결과 없이 끝났어요", harness_error=True)
+        for i in range(n) if i not in done
+    ]
+
+    # 지연 통계는 끝까지 완료한 세션만 사용합니다
+    completed = [r for r in finished if r.ok]
+    latencies = [lat for r in completed for lat in r.latencies]
+    ok = len(completed)
+    peak_rss = sum(r.peak_rss for r in finished)
+    est_rss  = (max((r.base_rss for r in completed), default=0)
+                + sum(max(0, r.peak_rss - r.base_rss) for r in completed))
+    return LevelReport(
+        sessions=n,
+        ok=ok,
+        failed=n - ok,
+        harness_errors=sum(r.harness_error for r in finished),
+        wall_s=round(wall, 3),
+        reruns=len(latencies),
+        p50_ms=round(percentile(latencies, 50) * 1000, 1),
+        p90_ms=round(percentile(latencies, 90) * 1000, 1),
+        p99_ms=round(percentile(latencies, 99) * 1000, 1),
+        max_ms=round(max(latencies, default=0.0) * 1000, 1),
+        sessions_per_s=round(ok / wall, 3) if wall else 0.0,
+        reruns_per_s=round(len(latencies) / wall, 3) if wall else 0.0,
+        peak_rss_mb=round(peak_rss / 1024 / 1024, 1),
+        est_rss_mb=round(est_rss / 1024 / 1024, 1),
+        peak_threads=sum(r.peak_threads for r in finished),
+        errors=[("[하네스] " if r.harness_error else "") + r.error
+                for r in sorted(finished, key=lambda r: r.index) if not r.ok],
+    )
+
+
+def print_report(reports: List[LevelReport]):
+    header = (f"{'N':>4} {'ok':>4} {'fail':>4} {'wall(s)':>8} {'p50(ms)':>9} {'p90(ms)':>9} "
+              f"{'p99(ms)':>9} {'max(ms)':>9} {'sess/s':>7} {'rerun/s':>8} {'RSS(MB)':>8} "
+              f"{'est(MB)':>8} {'threads':>7}")
+    print(header)
+    print("─" * len(header))
+    for r in reports:
+        print(f"{r.sessions:>4} {r.ok:>4} {r.failed:>4} {r.wall_s:>8.2f} {r.p50_ms:>9.1f} {r.p90_ms:>9.1f} "
+              f"{r.p99_ms:>9.1f} {r.max_ms:>9.1f} {r.sessions_per_s:>7.2f} {r.reruns_per_s:>8.2f} "
+              f"{r.peak_rss_mb:>8.1f} {r.est_rss_mb:>8.1f} {r.peak_threads:>7}")
+    for r in reports:
+        for err in r.errors[:3]:
+            print(f"  [N={r.sessions}] {err}")
+    if any(r.harness_errors for r in reports):
+        print("\n⚠ 앱이 아닌 하네스·런타임 오류가 있어 이 결과는 믿을 수 없어요.")
+
+
+# ── 메인 ─────────────────────────────────────────────────────────────────────
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="포동 app.py 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", default="1,2,4,8",
+                        help="쉼표로 구분한 동시 세션 수 단계 (기본: 1,2,4,8)")
+    parser.add_argument("--char-latency", type=float, default=1.5,
+                        help="대역 모델의 캐릭터 생성 평균 지연(초)")
+    parser.add_argument("--story-latency", type=float, default=5.0,
+                        help="대역 모델의 동화 생성 평균 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.3,
+                        help="지연 표준편차 비율 (평균 대비)")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="rerun 1회당 최대 대기 시간(초)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="측정 전에 워커마다 버리는 워밍업 세션 수")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="결과를 JSON 파일로도 저장")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    latency = StandInLatency(args.char_latency, args.story_latency, args.jitter)
+    photos = make_photos(MAX_SCENES)
+
+    reports = []
+    for n in levels:
+        print(f"▶ 동시 세션 {n}개 실행 중...", flush=True)
+        reports.append(run_level(n, photos, args.timeout, latency, args.seed, args.warmup))
+
+    print()
+    print_report(reports)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in reports], f, ensure_ascii=False, indent=2)
+
+    if any(r.harness_errors for r in reports):
+        return 3
+    return 0 if all(r.failed == 0 for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+==============================================================================
+🧸 포동 PHODONG — 로컬 동화 저장소
+==============================================================================
+batch.py 가 미리 만든 캐릭터 카드·동화를 파일로 저장하고,
+app.py 가 이를 API 호출 없이 바로 불러올 수 있게 합니다.
+
+  <STORE_DIR>/cards/<key>.json    사진 1장 → 캐릭터 데이터 (이어하기용 캐시)
+  <STORE_DIR>/stories/<key>.json  완성된 동화 (설정 + 카드 + 본문)
+  <STORE_DIR>/index/<key>.json    목록 표시용 요약 (제목·설정·날짜, 이미지 없음)
+==============================================================================
+"""
+
+import os, json, time, hashlib, logging, threading
+from typing import Optional, List, Tuple
+
+logger = logging.getLogger("Phodong.store")
+
+STORE_DIR = os.environ.get(
+    "PHODONG_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".phodong_store"),
+)
+
+
+# ── 키 ───────────────────────────────────────────────────────────────────────
+def _digest(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+def photo_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def card_key(photo: str, config: dict, seen_types: list) -> str:
+    return _digest({"photo": photo, "config": config, "seen": list(seen_types)})
+
+def story_key(config: dict, photos: List[str]) -> str:
+    return _digest({"config": config, "photos": list(photos)})
+
+
+# ── 파일 입출력 ───────────────────────────────────────────────────────────────
+def _path(kind: str, key: str, store_dir: Optional[str]) -> str:
+    return os.path.join(store_dir or STORE_DIR, kind, f"{key}.json")
+
+def _write(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)  # 중간에 죽어도 반쯤 쓴 파일이 남지 않도록
+
+def _read(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"저장소 파일 읽기 오류 ({path}): {e}")
+        return None
+
+
+# ── 캐릭터 카드 ───────────────────────────────────────────────────────────────
+def load_card(key: str, store_dir: Optional[str] = None) -> Optional[dict]:
+    return _read(_path("cards", key, store_dir))
+
+def save_card(key: str, data: dict, store_dir: Optional[str] = None):
+    _write(_path("cards", key, store_dir), data)
+
+
+# ── 동화 ─────────────────────────────────────────────────────────────────────
+def split_story(story_text: str) -> Tuple[str, str]:
+    """(제목, 본문). 첫 줄이 제목 — 동화 화면과 저장소 목록이 같은 규칙을 씁니다."""
+    lines = story_text.strip().split("\n")
+    title = lines[0].strip() or "나만의 동화"
+    body  = "\n".join(lines[1:]).strip() if len(lines) > 1 else story_text
+    return title, body
+
+def load_story(key: str, store_dir: Optional[str] = None) -> Optional[dict]:
+    return _read(_path("stories", key, store_dir))
+
+def save_story(key: str, config: dict, cards: List[dict], story_text: str,
+               store_dir: Optional[str] = None):
+    summary = {
+        "key":        key,
+        "title":      split_story(story_text)[0],
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "config":     config,
+    }
+    _write(_path("stories", key, store_dir), {**summary, "cards": cards, "story_text": story_text})
+    # 본문을 다 쓴 뒤에 요약을 써야 목록에 보이는 동화는 항상 불러올 수 있습니다
+    _write(_path("index", key, store_dir), summary)
+
+def list_stories(store_dir: Optional[str] = None) -> List[dict]:
+    """저장된 동화 목록 (최신순). 카드 이미지가 든 본문 대신 작은 요약 파일만 읽습니다."""
+    folder = os.path.join(store_dir or STORE_DIR, "index")
+    if not os.path.isdir(folder):
+        return []
+    summaries = []
+    for name in os.listdir(folder):
+        if not name.endswith(".json"):
+            continue
+        data = _read(os.path.join(folder, name))
+        if data:
+            summaries.append(data)
+    return sorted(summaries, key=lambda s: s.get("created_at", ""), reverse=True)